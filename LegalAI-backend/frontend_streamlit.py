@@ -6,65 +6,135 @@
 #    streamlit run frontend_streamlit.py
 
 import streamlit as st
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:8000"
+REQUEST_TIMEOUT = 5
+# Chat and upload requests wait on Gemini, so they get a longer read timeout.
+AI_REQUEST_TIMEOUT = (REQUEST_TIMEOUT, 120)
+# Cached resources younger than this are reused without even a conditional GET.
+FETCH_DEBOUNCE_SECONDS = 2.0
+# How often documents still being parsed by the backend are polled.
+DOCUMENT_POLL_SECONDS = 2
 
 # --- Helper Functions to Interact with Backend ---
 
-def get_cases():
-    """Fetches all cases from the backend."""
+def http_session() -> requests.Session:
+    """Returns this browser session's pooled HTTP session, so connections survive reruns."""
+    if 'http' not in st.session_state:
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        st.session_state.http = session
+    return st.session_state.http
+
+def fetch_with_etag(path: str):
+    """GETs a backend resource, reusing the cached copy when it is fresh or the server answers 304."""
+    http_cache = st.session_state.setdefault('http_cache', {})
+    cached = http_cache.get(path)
+    now = time.monotonic()
+    if cached and now - cached[2] < FETCH_DEBOUNCE_SECONDS:
+        return cached[1]
+    headers = {'If-None-Match': cached[0]} if cached else {}
+    response = http_session().get(f"{API_BASE_URL}{path}", headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        http_cache[path] = (cached[0], cached[1], now)
+        return cached[1]
+    response.raise_for_status()
+    data = response.json()
+    etag = response.headers.get('etag')
+    if etag:
+        http_cache[path] = (etag, data, now)
+    return data
+
+def mark_fetched(path: str):
+    """Records that the cached copy of path was just brought up to date locally."""
+    cached = st.session_state.get('http_cache', {}).get(path)
+    if cached:
+        st.session_state.http_cache[path] = (cached[0], cached[1], time.monotonic())
+
+def invalidate_cached(path: str):
+    """Forces the next fetch of path to go to the backend."""
+    st.session_state.get('http_cache', {}).pop(path, None)
+
+def get_case_summaries():
+    """Fetches the id and name of every case from the backend and indexes them for the sidebar."""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/cases", timeout=5)
-        response.raise_for_status()
-        return response.json()
+        summaries = fetch_with_etag("/api/cases")
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to backend: {e}")
-        return []
+        summaries = []
+    # Built once per fetch so the sidebar never has to scan the list on a rerun
+    summaries = sorted(summaries, key=lambda case: case['name'])
+    st.session_state.case_ids = [case['id'] for case in summaries]
+    st.session_state.case_index_by_id = {case['id']: i for i, case in enumerate(summaries)}
+    st.session_state.case_names_by_id = {case['id']: case['name'] for case in summaries}
+    return summaries
+
+def get_case(case_id: int):
+    """Fetches the full details (documents and chat history) of a single case."""
+    try:
+        return fetch_with_etag(f"/api/cases/{case_id}")
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error loading case: {e}")
+        return None
 
 def create_new_case(name: str):
     """Sends a request to create a new case."""
     try:
-        response = requests.post(f"{API_BASE_URL}/api/cases", json={"name": name})
+        response = http_session().post(f"{API_BASE_URL}/api/cases", json={"name": name}, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to create case: {e}")
         return None
 
-def post_chat_message(case_id: int, message: str):
-    """Sends a user's chat message to the backend."""
+def stream_chat_message(case_id: int, message: str):
+    """Sends a user's chat message to the backend and yields the agent's reply as it streams in."""
     try:
-        response = requests.post(f"{API_BASE_URL}/api/cases/{case_id}/chat", json={"message": message})
-        response.raise_for_status()
-        return response.json()
+        with http_session().post(f"{API_BASE_URL}/api/cases/{case_id}/chat", json={"message": message}, stream=True, timeout=AI_REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to send message: {e}")
-        return None
 
 def upload_document_to_case(case_id: int, file):
     """Uploads a document to a specific case."""
     try:
         files = {'file': (file.name, file, file.type)}
-        response = requests.post(f"{API_BASE_URL}/api/cases/{case_id}/documents", files=files)
+        response = http_session().post(f"{API_BASE_URL}/api/cases/{case_id}/documents", files=files, timeout=AI_REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to upload document: {e}")
         return None
 
+def get_document(case_id: int, doc_id: int):
+    """Fetches a single document, e.g. to check whether its parsing has finished."""
+    try:
+        response = http_session().get(f"{API_BASE_URL}/api/cases/{case_id}/documents/{doc_id}", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to check document status: {e}")
+        return None
+
 # --- Main Application UI ---
 
 st.set_page_config(layout="wide", page_title="Legal Aid Assistant")
 
 # Initialize session state to hold data
-if 'cases' not in st.session_state:
-    st.session_state.cases = get_cases()
+if 'case_summaries' not in st.session_state:
+    st.session_state.case_summaries = get_case_summaries()
 
 if 'selected_case_id' not in st.session_state:
-    st.session_state.selected_case_id = st.session_state.cases[0]['id'] if st.session_state.cases else None
+    st.session_state.selected_case_id = st.session_state.case_summaries[0]['id'] if st.session_state.case_summaries else None
 
 # --- Sidebar for Navigation ---
 with st.sidebar:
@@ -78,40 +148,119 @@ with st.sidebar:
             with st.spinner("Creating case..."):
                 new_case = create_new_case(new_case_name)
                 if new_case:
-                    st.session_state.cases = get_cases() # Refresh case list
+                    invalidate_cached("/api/cases")
+                    st.session_state.case_summaries = get_case_summaries() # Refresh case list
                     st.session_state.selected_case_id = new_case['id']
                     st.success(f"Case '{new_case_name}' created!")
 
     st.header("Your Cases")
-    if st.session_state.cases:
-        case_names = [case['name'] for case in st.session_state.cases]
-        case_ids = [case['id'] for case in st.session_state.cases]
-        
-        # Find the index of the currently selected case
-        try:
-            selected_index = case_ids.index(st.session_state.selected_case_id)
-        except (ValueError, TypeError):
-            selected_index = 0
-
-        selected_case_name = st.radio(
+    if st.session_state.case_summaries:
+        # Look up the currently selected case's position; ids stay unique even if names repeat
+        selected_index = st.session_state.case_index_by_id.get(st.session_state.selected_case_id, 0)
+        st.session_state.selected_case_id = st.radio(
             "Select a case",
-            options=case_names,
+            options=st.session_state.case_ids,
             index=selected_index,
+            format_func=st.session_state.case_names_by_id.get,
             label_visibility="collapsed"
         )
-        # Update selected_case_id based on the name selected
-        st.session_state.selected_case_id = case_ids[case_names.index(selected_case_name)]
     else:
         st.write("No cases found.")
 
 
+# --- Case Panels ---
+# Each panel is a fragment so sending a message or uploading a document only
+# reruns that panel instead of the whole script.
+
+@st.fragment
+def chat_panel(selected_case):
+    st.header("Case Chat")
+
+    # Display chat history
+    chat_container = st.container(height=500, border=True)
+    with chat_container:
+        for message in selected_case.get('chat_history', []):
+            with st.chat_message(name=message['sender']):
+                st.write(message['content'])
+
+    # Chat input
+    if prompt := st.chat_input("Ask a question about your case..."):
+        # Display user message
+        with chat_container:
+            with st.chat_message("user"):
+                st.write(prompt)
+
+            # Send message to backend and render the response as it streams in
+            with st.chat_message("agent"):
+                agent_response = st.write_stream(stream_chat_message(selected_case['id'], prompt))
+
+        if agent_response:
+            # Record both messages locally and redraw only this panel
+            selected_case['chat_history'].append({'sender': 'user', 'content': prompt})
+            selected_case['chat_history'].append({'sender': 'agent', 'content': agent_response})
+            # The local copy already has the reply, so skip refetching the case right away
+            mark_fetched(f"/api/cases/{selected_case['id']}")
+            st.rerun(scope="fragment")
+
+@st.fragment
+def docs_panel(selected_case):
+    st.header("Documents & Info")
+
+    # Document Uploader
+    with st.form("upload_form", clear_on_submit=True):
+        uploaded_file = st.file_uploader(
+            "Upload a document (PNG, JPG)",
+            type=['png', 'jpg', 'jpeg']
+        )
+        upload_submitted = st.form_submit_button("Upload and Analyze")
+
+        if upload_submitted and uploaded_file is not None:
+            with st.spinner(f"Uploading {uploaded_file.name}..."):
+                upload_result = upload_document_to_case(selected_case['id'], uploaded_file)
+                if upload_result:
+                    # Record the new document locally. It is still being parsed, so rerun the
+                    # whole page to start polling for the result.
+                    selected_case['documents'].append(upload_result)
+                    mark_fetched(f"/api/cases/{selected_case['id']}")
+                    st.rerun()
+
+    st.divider()
+
+    # Display uploaded documents
+    st.subheader("Uploaded Documents")
+    if selected_case.get('documents'):
+        for doc in selected_case['documents']:
+            with st.expander(f"{doc['name']}"):
+                st.write(f"**Upload Date:** {datetime.fromisoformat(doc['upload_date']).strftime('%Y-%m-%d')}")
+                st.write(f"**AI Summary:** *{doc['summary']}*")
+                if doc.get('extracted_data'):
+                    st.write("**Extracted Data:**")
+                    st.json(doc['extracted_data'])
+    else:
+        st.info("No documents have been uploaded for this case yet.")
+
+
+@st.fragment(run_every=DOCUMENT_POLL_SECONDS)
+def poll_pending_documents(selected_case):
+    """Refreshes documents the backend is still parsing, until none are left."""
+    pending = [doc for doc in selected_case['documents'] if doc.get('status') == 'pending']
+    for doc in pending:
+        refreshed = get_document(selected_case['id'], doc['id'])
+        if refreshed:
+            doc.update(refreshed)
+    if not any(doc.get('status') == 'pending' for doc in pending):
+        # Parsing also posts a chat message, so reload the whole case.
+        invalidate_cached(f"/api/cases/{selected_case['id']}")
+        st.rerun()
+
+
 # --- Main Panel for Case Details ---
 if not st.session_state.selected_case_id:
     st.header("Select a case from the sidebar or create a new one to get started.")
 else:
-    # Find the full data for the selected case
-    selected_case = next((case for case in st.session_state.cases if case['id'] == st.session_state.selected_case_id), None)
-    
+    # Fetch the full data for the selected case; unchanged cases are served from the local cache
+    selected_case = get_case(st.session_state.selected_case_id)
+
     if not selected_case:
         st.error("Selected case not found. Please refresh.")
     else:
@@ -121,59 +270,9 @@ else:
         col1, col2 = st.columns([2, 1])
 
         with col1:
-            st.header("Case Chat")
-            
-            # Display chat history
-            chat_container = st.container(height=500, border=True)
-            with chat_container:
-                for message in selected_case.get('chat_history', []):
-                    with st.chat_message(name=message['sender']):
-                        st.write(message['content'])
-
-            # Chat input
-            if prompt := st.chat_input("Ask a question about your case..."):
-                # Display user message
-                with chat_container:
-                    with st.chat_message("user"):
-                        st.write(prompt)
-
-                # Send message to backend and get response
-                with st.spinner("Agent is thinking..."):
-                    agent_response = post_chat_message(selected_case['id'], prompt)
-                    if agent_response:
-                        # Refresh cases and rerun to display the new message
-                        st.session_state.cases = get_cases()
-                        st.rerun()
+            chat_panel(selected_case)
 
         with col2:
-            st.header("Documents & Info")
-
-            # Document Uploader
-            with st.form("upload_form", clear_on_submit=True):
-                uploaded_file = st.file_uploader(
-                    "Upload a document (PNG, JPG)",
-                    type=['png', 'jpg', 'jpeg']
-                )
-                upload_submitted = st.form_submit_button("Upload and Analyze")
-
-                if upload_submitted and uploaded_file is not None:
-                    with st.spinner(f"Uploading and analyzing {uploaded_file.name}..."):
-                        upload_result = upload_document_to_case(selected_case['id'], uploaded_file)
-                        if upload_result:
-                            st.session_state.cases = get_cases() # Refresh case list
-                            st.rerun()
-
-            st.divider()
-
-            # Display uploaded documents
-            st.subheader("Uploaded Documents")
-            if selected_case.get('documents'):
-                for doc in selected_case['documents']:
-                    with st.expander(f"{doc['name']}"):
-                        st.write(f"**Upload Date:** {datetime.fromisoformat(doc['upload_date']).strftime('%Y-%m-%d')}")
-                        st.write(f"**AI Summary:** *{doc['summary']}*")
-                        if doc.get('extracted_data'):
-                            st.write("**Extracted Data:**")
-                            st.json(doc['extracted_data'])
-            else:
-                st.info("No documents have been uploaded for this case yet.")
+            docs_panel(selected_case)
+            if any(doc.get('status') == 'pending' for doc in selected_case['documents']):
+                poll_pending_documents(selected_case)
@@ -0,0 +1,16 @@
+# gunicorn_conf.py
+# Gunicorn settings for serving the backend with Uvicorn workers.
+# To run this:
+#    gunicorn -c gunicorn_conf.py main:app
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 30
+
+# The mock DB and ETag version live in process memory, so separate workers
+# would each see a different set of cases. Stay on a single worker by default.
+# Once state moves to a shared store (e.g. SQLite or Redis), set WEB_CONCURRENCY
+# to scale out, typically to 2 * CPU cores + 1.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
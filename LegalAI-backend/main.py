@@ -2,23 +2,32 @@
 # This file contains the backend logic for the AI Legal Aid Assistant.
 # To run this:
 # 1. Install necessary libraries:
-#    pip install "fastapi[all]" uvicorn python-multipart google-generativeai Pillow python-dotenv
+#    pip install "fastapi[all]" uvicorn python-multipart google-generativeai Pillow python-dotenv diskcache orjson
 # 2. Create a file named `.env` in the same directory as this main.py file.
 # 3. In the .env file, add the following line (replace with your actual key):
 #    GOOGLE_API_KEY="YOUR_API_KEY_HERE"
 # 4. Save the main.py and .env files.
 # 5. Run from your terminal:
 #    uvicorn main:app --reload
+#    or, to serve with Gunicorn-managed Uvicorn workers (pip install gunicorn):
+#    gunicorn -c gunicorn_conf.py main:app
 
 import uvicorn
+import asyncio
 import re
-import json
+import orjson
 import os
-import io
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+import hashlib
+import itertools
+import tempfile
+import uuid
+import diskcache
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Literal, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, field_validator
+from typing import List, Literal, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -40,6 +49,36 @@ try:
 except Exception as e:
     print(f"Error configuring Gemini API: {e}")
 
+GEMINI_MODEL_NAME = 'gemini-1.5-flash-latest'
+CHAT_SYSTEM_INSTRUCTION = "You are a helpful and empathetic legal case assistant. Do not provide legal advice, but help the user understand their situation based on the information provided."
+
+# Models are built once and shared across requests so their client transport is reused.
+_GEMINI_MODEL = genai.GenerativeModel(GEMINI_MODEL_NAME)
+_CHAT_MODEL = genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=CHAT_SYSTEM_INSTRUCTION)
+
+# Persistent cache of Gemini results so repeated prompts and re-uploaded
+# documents don't trigger another (slow, billed) API call.
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Longest edge Gemini actually uses for vision input; larger uploads only cost bandwidth.
+GEMINI_MAX_IMAGE_EDGE = 1568
+_LLM_CACHE = diskcache.Cache(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.llm_cache'))
+
+def _cache_key(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+def _file_digest(path: str) -> bytes:
+    """Hashes a file in chunks so large uploads never have to sit in memory."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
 
 # --- Pydantic Models (Data Schemas) ---
 class ChatMessage(BaseModel):
@@ -54,25 +93,99 @@ class Document(BaseModel):
     upload_date: datetime = Field(default_factory=datetime.now)
     summary: str
     extracted_data: Dict[str, Any]
+    status: Literal["pending", "ready", "failed"] = "ready"
+
+class ParsedDocument(BaseModel):
+    """The fields Gemini is asked to return when parsing a document image."""
+    summary: str
+    extracted_data: Dict[str, Any] = {}
 
 class Case(BaseModel):
     id: int
     name: str
     created_at: datetime = Field(default_factory=datetime.now)
-    documents: List[Document] = []
-    chat_history: List[ChatMessage] = []
+    # Indexed by id for O(1) lookups; serialized as plain lists so the wire format is unchanged.
+    documents: Dict[int, Document] = {}
+    chat_history: Dict[int, ChatMessage] = {}
+    _message_ids: Iterator[int] = PrivateAttr()
+    _summary_prefix: Optional[str] = PrivateAttr(default=None)
+
+    @field_validator("documents", "chat_history", mode="before")
+    @classmethod
+    def _index_by_id(cls, value):
+        if isinstance(value, list):
+            return {item["id"] if isinstance(item, dict) else item.id: item for item in value}
+        return value
+
+    @field_serializer("documents")
+    def _documents_as_list(self, documents: Dict[int, Document]) -> List[Document]:
+        return list(documents.values())
+
+    @field_serializer("chat_history")
+    def _chat_history_as_list(self, chat_history: Dict[int, ChatMessage]) -> List[ChatMessage]:
+        return list(chat_history.values())
+
+    def add_message(self, sender: Literal["user", "agent"], content: str) -> ChatMessage:
+        """Appends a new chat message with the next free id."""
+        message = ChatMessage(id=self.next_message_id(), sender=sender, content=content)
+        self.chat_history[message.id] = message
+        return message
+
+    def model_post_init(self, __context: Any) -> None:
+        # Seeded eagerly so id allocation is a single atomic next() call, even
+        # when the streamed reply or the background parser run in worker threads.
+        self._message_ids = itertools.count(max(self.chat_history, default=0) + 1)
+
+    def next_message_id(self) -> int:
+        """Allocates a unique chat message id, safe under interleaved or threaded requests."""
+        return next(self._message_ids)
+
+    def document_summaries(self) -> str:
+        """The prompt block describing this case's documents, cached until a document is added."""
+        if self._summary_prefix is None:
+            lines = "".join(f"Document '{doc.name}': {doc.summary}\n" for doc in self.documents.values())
+            if not lines:
+                lines = "No documents have been uploaded for this case yet.\n"
+            self._summary_prefix = f"--- Case Document Summaries ---\n{lines}"
+        return self._summary_prefix
+
+    def invalidate_document_summaries(self):
+        self._summary_prefix = None
+
+class CaseSummary(BaseModel):
+    id: int
+    name: str
+    created_at: datetime
 
 # --- Mock Database ---
 DB: Dict[int, Case] = {}
+# Bumped on every write so clients can revalidate the case list with an ETag.
+# The boot id keeps ETags from a previous server run from matching after a restart.
+DB_VERSION = 0
+_BOOT_ID = uuid.uuid4().hex
+
+def bump_db_version():
+    """Marks the mock DB as changed, invalidating any cached case list ETags."""
+    global DB_VERSION
+    DB_VERSION += 1
+
+def current_etag() -> str:
+    digest = hashlib.sha1(f"{_BOOT_ID}:{DB_VERSION}".encode()).hexdigest()
+    return f'"{digest}"'
+
+# O(1) id allocation that can't hand out the same id twice under concurrent requests.
+_CASE_ID_SEQ = itertools.count(start=1)
+_DOCUMENT_ID_SEQ = itertools.count(start=101)
 
 def initialize_mock_db():
     """Populates the mock DB with some initial data for demonstration."""
+    case_id = next(_CASE_ID_SEQ)
     case_1 = Case(
-        id=1,
+        id=case_id,
         name="Parking Ticket on Elm St.",
         documents=[
             Document(
-                id=101,
+                id=next(_DOCUMENT_ID_SEQ),
                 name="parking_ticket.pdf",
                 summary="A parking violation for an expired meter. Fine is $75, due by 2025-07-15.",
                 extracted_data={"fine_amount": 75, "due_date": "2025-07-15", "violation": "Expired Meter"}
@@ -82,7 +195,7 @@ def initialize_mock_db():
             ChatMessage(id=1, sender="agent", content="Hello! I'm your case assistant. I see you've uploaded a parking ticket. How can I help you today?")
         ]
     )
-    DB[1] = case_1
+    DB[case_id] = case_1
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
@@ -98,39 +211,123 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class NonStreamingGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves the streamed chat endpoint alone.
+
+    Starlette compresses streaming bodies regardless of minimum_size and doesn't
+    flush between chunks, so a gzipped chat reply would only arrive once complete.
+    """
+    _SKIP_PATH_RE = re.compile(r"^/api/cases/\d+/chat$")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self._SKIP_PATH_RE.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Case details are dominated by repeated JSON keys and timestamps, which compress well.
+app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # --- Helper Functions ---
 
+# All PII patterns fused into one alternation so each message is scanned once.
+_PII_RE = re.compile(
+    r'(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+    r'|(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)'
+    r'|(?P<phone>\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
+)
+_PII_REPLACEMENTS = {
+    "email": "[REDACTED_EMAIL]",
+    "phone": "[REDACTED_PHONE]",
+    "ssn": "[REDACTED_SSN]",
+}
+
 def pii_redaction_service(text: str) -> str:
     """A simple PII redaction service using regex."""
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[REDACTED_EMAIL]', text)
-    text = re.sub(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', '[REDACTED_PHONE]', text)
-    text = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[REDACTED_SSN]', text)
-    return text
+    # Every pattern needs either an '@' (email) or at least 9 digits (SSN, phone),
+    # so most short chat messages can skip the regex scan entirely.
+    if '@' not in text and sum(map(str.isdigit, text)) < 9:
+        return text
+    return _PII_RE.sub(lambda m: _PII_REPLACEMENTS[m.lastgroup], text)
+
+def build_chat_prompt(case: Case, redacted_query: str) -> str:
+    """Builds the per-turn prompt from the case's document summaries, conversation and new question."""
+    # Earlier user messages are stored verbatim, so redact them before they reach the prompt.
+    history = "".join(
+        f"{msg.sender.capitalize()}: {pii_redaction_service(msg.content) if msg.sender == 'user' else msg.content}\n"
+        for msg in case.chat_history.values()
+    )
+    return (
+        f"{case.document_summaries()}"
+        f"\n--- Conversation History ---\n{history}"
+        f"\n--- New User Question ---\nUser: {redacted_query}\n\n---\n"
+        "Based on all the information above, provide a helpful and concise answer to the new user question."
+    )
 
-def call_gemini_api_for_chat(prompt: str) -> str:
-    """Makes a real call to the Google Gemini API for chat responses."""
+def stream_gemini_api_for_chat(prompt: str) -> Iterator[str]:
+    """Streams a chat response from the Google Gemini API, yielding text chunks as they arrive."""
     if not GOOGLE_API_KEY:
-        return "Error: The AI assistant is not configured. Please set the GOOGLE_API_KEY in your .env file."
+        yield "Error: The AI assistant is not configured. Please set the GOOGLE_API_KEY in your .env file."
+        return
+    key = _cache_key(b'chat', GEMINI_MODEL_NAME.encode(), CHAT_SYSTEM_INSTRUCTION.encode(), prompt.encode())
+    cached = _LLM_CACHE.get(key)
+    if cached is not None:
+        yield cached
+        return
+    chunks = []
     try:
         print("\n--- Sending Prompt to Gemini ---")
         print(prompt)
         print("---------------------------------\n")
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content(prompt)
-        return response.text
+        for chunk in _CHAT_MODEL.generate_content(prompt, stream=True):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
     except Exception as e:
         print(f"Gemini API call failed: {e}")
-        return "Sorry, I'm having trouble connecting to the AI service right now."
+        yield "Sorry, I'm having trouble connecting to the AI service right now."
+        return
+    _LLM_CACHE.set(key, "".join(chunks), expire=LLM_CACHE_TTL_SECONDS)
 
-def call_gemini_api_for_document_parsing(file_content: bytes, filename: str) -> Dict[str, Any]:
-    """Calls Gemini's multimodal capabilities to parse a document."""
+def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+    """Converts an image to RGB, compositing any transparency onto white.
+
+    A plain convert("RGB") discards alpha, which turns e.g. black text on a
+    transparent background into a solid black image.
+    """
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        flattened = Image.new("RGB", rgba.size, "white")
+        flattened.paste(rgba, mask=rgba.getchannel("A"))
+        return flattened
+    return image.convert("RGB")
+
+def _unparsed_document_result(filename: str) -> Dict[str, Any]:
+    return {
+        "summary": f"Could not automatically parse '{filename}'. Please review it manually.",
+        "extracted_data": {"error": "AI parsing failed"}
+    }
+
+def call_gemini_api_for_document_parsing(image_path: str, filename: str) -> Tuple[Dict[str, Any], bool]:
+    """Calls Gemini's multimodal capabilities to parse the document image stored at image_path.
+
+    Returns the summary/extracted_data fields and whether parsing succeeded.
+    """
     if not GOOGLE_API_KEY:
-        return {"summary": "AI not configured.", "extracted_data": {}}
+        return {"summary": "AI not configured.", "extracted_data": {}}, False
     
     try:
-        image = Image.open(io.BytesIO(file_content))
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        
+        key = _cache_key(b'document', GEMINI_MODEL_NAME.encode(), _file_digest(image_path))
+        cached = _LLM_CACHE.get(key)
+        if cached is not None:
+            return ParsedDocument.model_validate(cached).model_dump(), True
+
+        with Image.open(image_path) as source:
+            # Let JPEG decode at reduced scale, then normalize and shrink before upload.
+            source.draft("RGB", (GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE))
+            image = _flatten_to_rgb(source)
+        image.thumbnail((GEMINI_MAX_IMAGE_EDGE, GEMINI_MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+
         prompt = """
         You are an expert data extractor for legal documents. Analyze the attached image of a document.
         First, provide a one-sentence summary of the document's purpose.
@@ -150,34 +347,47 @@ def call_gemini_api_for_document_parsing(file_content: bytes, filename: str) ->
         }
         """
         
-        response = model.generate_content([prompt, image])
+        response = _GEMINI_MODEL.generate_content([prompt, image])
         
         json_response_text = response.text.strip().replace("```json", "").replace("```", "")
-        data = json.loads(json_response_text)
-        return data
+        # Only keep the fields we asked for, and only cache a reply once it has the right shape.
+        data = ParsedDocument.model_validate(orjson.loads(json_response_text)).model_dump()
+        _LLM_CACHE.set(key, data, expire=LLM_CACHE_TTL_SECONDS)
+        return data, True
 
     except Exception as e:
         print(f"Gemini document parsing failed: {e}")
-        return {
-            "summary": f"Could not automatically parse '{filename}'. Please review it manually.",
-            "extracted_data": {"error": "AI parsing failed"}
-        }
+        return _unparsed_document_result(filename), False
 
 # --- API Endpoints ---
 @app.on_event("startup")
 async def startup_event():
     initialize_mock_db()
 
-@app.get("/api/cases", response_model=List[Case])
-async def get_all_cases():
-    return list(DB.values())
+@app.get("/api/cases", response_model=List[CaseSummary])
+async def get_all_cases(request: Request, response: Response):
+    etag = current_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return [CaseSummary(id=case.id, name=case.name, created_at=case.created_at) for case in DB.values()]
+
+@app.get("/api/cases/{case_id}", response_model=Case)
+async def get_case(case_id: int, request: Request, response: Response):
+    if case_id not in DB:
+        raise HTTPException(status_code=404, detail="Case not found")
+    etag = current_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return DB[case_id]
 
 @app.post("/api/cases", response_model=Case, status_code=201)
 async def create_case(payload: Dict[str, str] = Body(...)):
     case_name = payload.get("name")
     if not case_name:
         raise HTTPException(status_code=400, detail="Case name is required.")
-    new_id = max(DB.keys()) + 1 if DB else 1
+    new_id = next(_CASE_ID_SEQ)
     new_case = Case(
         id=new_id,
         name=case_name,
@@ -186,6 +396,7 @@ async def create_case(payload: Dict[str, str] = Body(...)):
         ]
     )
     DB[new_id] = new_case
+    bump_db_version()
     return new_case
 
 @app.post("/api/cases/{case_id}/chat")
@@ -196,55 +407,108 @@ async def chat_with_agent(case_id: int, payload: Dict[str, str] = Body(...)):
     if not user_query:
         raise HTTPException(status_code=400, detail="Message content is required.")
     case = DB[case_id]
-    user_message_id = len(case.chat_history) + 1
-    case.chat_history.append(ChatMessage(id=user_message_id, sender="user", content=user_query))
     redacted_query = pii_redaction_service(user_query)
-    prompt_context = "You are a helpful and empathetic legal case assistant. Do not provide legal advice, but help the user understand their situation based on the information provided.\n\n"
-    prompt_context += "--- Case Document Summaries ---\n"
-    if case.documents:
-        for doc in case.documents:
-            prompt_context += f"Document '{doc.name}': {doc.summary}\n"
+    prompt = build_chat_prompt(case, redacted_query)
+    case.add_message("user", user_query)
+
+    def stream_reply() -> Iterator[str]:
+        # The reply is persisted before the generator finishes, so a client that
+        # refreshes the case list once the stream ends always sees the new message.
+        chunks = []
+        for chunk in stream_gemini_api_for_chat(prompt):
+            chunks.append(chunk)
+            yield chunk
+        case.add_message("agent", "".join(chunks))
+        bump_db_version()
+
+    return StreamingResponse(stream_reply(), media_type="text/plain; charset=utf-8")
+
+def _store_parsed_document(case_id: int, doc_id: int, filename: str, parsing_result: Dict[str, Any], status: str):
+    case = DB.get(case_id)
+    if case is None:
+        return
+    document = case.documents.get(doc_id)
+    if document is None:
+        return
+    case.documents[doc_id] = Document.model_validate({**document.model_dump(), **parsing_result, "status": status})
+    case.invalidate_document_summaries()
+    if status == "ready":
+        content = f"Thank you. I have successfully processed the document: '{filename}'. You can now ask me questions about it."
     else:
-        prompt_context += "No documents have been uploaded for this case yet.\n"
-    prompt_context += "\n--- Conversation History ---\n"
-    for msg in case.chat_history:
-        prompt_context += f"{msg.sender.capitalize()}: {msg.content}\n"
-    prompt_context += f"\n--- New User Question ---\nUser: {redacted_query}\n\n---\n"
-    prompt_context += "Based on all the information above, provide a helpful and concise answer to the new user question."
-    agent_response_text = call_gemini_api_for_chat(prompt_context)
-    agent_message_id = len(case.chat_history) + 1
-    agent_message = ChatMessage(id=agent_message_id, sender="agent", content=agent_response_text)
-    case.chat_history.append(agent_message)
-    return agent_message
+        content = f"I received the document '{filename}', but couldn't read it automatically. Please review it manually."
+    case.add_message("agent", content)
+    bump_db_version()
+
+def parse_and_store_document(case_id: int, doc_id: int, image_path: str, filename: str):
+    """Background task: parses an uploaded document with Gemini and fills in its pending record."""
+    try:
+        parsing_result, parsed = call_gemini_api_for_document_parsing(image_path, filename)
+        _store_parsed_document(case_id, doc_id, filename, parsing_result, "ready" if parsed else "failed")
+    except Exception as e:
+        # Never leave the document pending, or clients would poll it forever.
+        print(f"Storing parsed document '{filename}' failed: {e}")
+        _store_parsed_document(case_id, doc_id, filename, _unparsed_document_result(filename), "failed")
+    finally:
+        os.remove(image_path)
+
+# Strong references to in-flight parse tasks, so they are not garbage-collected before they finish.
+_PARSE_TASKS: set = set()
 
 @app.post("/api/cases/{case_id}/documents", response_model=Document)
 async def upload_document(case_id: int, file: UploadFile = File(...)):
     if case_id not in DB:
         raise HTTPException(status_code=404, detail="Case not found")
     
-    if not file.content_type.startswith("image/"):
+    if not (file.content_type or "").startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image (e.g., PNG, JPG) for Vision API processing.")
-        
-    file_content = await file.read()
-    parsing_result = call_gemini_api_for_document_parsing(file_content, file.filename)
-    case = DB[case_id]
-    new_doc_id = len(case.documents) + 101
+
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Uploaded file must have a filename.")
+
+    # Build the record before touching the disk, so nothing below can fail with a temp file on hand.
+    new_doc_id = next(_DOCUMENT_ID_SEQ)
     new_document = Document(
         id=new_doc_id,
         name=file.filename,
-        summary=parsing_result.get("summary", "No summary provided."),
-        extracted_data=parsing_result.get("extracted_data", {})
-    )
-    case.documents.append(new_document)
-    agent_message_id = len(case.chat_history) + 1
-    confirmation_message = ChatMessage(
-        id=agent_message_id,
-        sender="agent",
-        content=f"Thank you. I have successfully processed the document: '{file.filename}'. You can now ask me questions about it."
+        summary="Parsing in progress...",
+        extracted_data={},
+        status="pending"
     )
-    case.chat_history.append(confirmation_message)
+
+    # Spool the upload to disk in chunks rather than buffering the whole image in memory.
+    # From here until the parser owns the file, any failure must remove it.
+    suffix = os.path.splitext(file.filename)[1]
+    tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        with tmp:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
+        # Gemini parsing takes seconds; start it now rather than as a response background task,
+        # so it runs (and removes the file) even if sending the response fails.
+        task = asyncio.create_task(
+            asyncio.to_thread(parse_and_store_document, case_id, new_doc_id, tmp.name, file.filename)
+        )
+    except BaseException:
+        os.remove(tmp.name)
+        raise
+    _PARSE_TASKS.add(task)
+    task.add_done_callback(_PARSE_TASKS.discard)
+
+    case = DB[case_id]
+    case.documents[new_doc_id] = new_document
+    case.invalidate_document_summaries()
+    bump_db_version()
     return new_document
 
+@app.get("/api/cases/{case_id}/documents/{doc_id}", response_model=Document)
+async def get_document(case_id: int, doc_id: int):
+    if case_id not in DB:
+        raise HTTPException(status_code=404, detail="Case not found")
+    document = DB[case_id].documents.get(doc_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
 @app.get("/api/test-gemini")
 async def test_gemini_connection():
     """An endpoint to explicitly test the connection to the Gemini API."""
@@ -252,8 +516,7 @@ async def test_gemini_connection():
         raise HTTPException(status_code=500, detail="Gemini API key not found. Please create a .env file and add GOOGLE_API_KEY='your-key'.")
     
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content("Say 'Hello, World!'")
+        response = await asyncio.to_thread(_GEMINI_MODEL.generate_content, "Say 'Hello, World!'")
         
         if response.text:
             return {"status": "success", "message": "Gemini API connection is working!", "response": response.text}
@@ -35,10 +35,11 @@ export default function App() {
       if (!response.ok) {
         throw new Error('Failed to fetch cases from the backend.');
       }
+      // The list only holds case summaries; details are loaded per case
       const data = await response.json();
       setCases(data);
       if (data.length > 0) {
-        setSelectedCase(data[0]);
+        await loadCase(data[0].id);
       }
     } catch (err) {
       setError(err.message);
@@ -48,6 +49,19 @@ export default function App() {
     }
   };
 
+  const loadCase = async (caseId) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/cases/${caseId}`, { mode: 'cors' });
+      if (!response.ok) {
+        throw new Error('Failed to load case details from the backend.');
+      }
+      setSelectedCase(await response.json());
+    } catch (err) {
+      setError(err.message);
+      console.error(err);
+    }
+  };
+
   const handleCreateCase = async () => {
     const newCaseName = prompt("Enter a name for the new case:");
     if (newCaseName && newCaseName.trim() !== "") {
@@ -69,7 +83,7 @@ export default function App() {
   };
   
   const handleSelectCase = (caseData) => {
-    setSelectedCase(caseData);
+    loadCase(caseData.id);
   }
 
   // This function will be passed down to the ChatPanel to update the state
@@ -165,6 +179,7 @@ const CaseDetailPanel = ({ caseData, updateCaseData }) => {
 const ChatPanel = ({ caseData, updateCaseData }) => {
   const [newMessage, setNewMessage] = useState('');
   const [isTyping, setIsTyping] = useState(false);
+  const [isWaitingForReply, setIsWaitingForReply] = useState(false);
   const chatContainerRef = useRef(null);
   
   useEffect(() => {
@@ -189,6 +204,7 @@ const ChatPanel = ({ caseData, updateCaseData }) => {
     updateCaseData(caseData.id, { chat_history: [...caseData.chat_history, userMessage] });
     setNewMessage('');
     setIsTyping(true);
+    setIsWaitingForReply(true);
 
     try {
         const response = await fetch(`${API_BASE_URL}/api/cases/${caseData.id}/chat`, {
@@ -198,10 +214,25 @@ const ChatPanel = ({ caseData, updateCaseData }) => {
             mode: 'cors',
         });
         if (!response.ok) throw new Error('Failed to send message.');
-        const agentResponse = await response.json();
 
-        // Replace optimistic update with final data
-         updateCaseData(caseData.id, { chat_history: [...caseData.chat_history, userMessage, agentResponse] });
+        // The reply is streamed as plain text; render it as the chunks arrive
+        const agentResponse = {
+            id: Date.now() + 1, // temporary id
+            sender: 'agent',
+            content: '',
+            timestamp: new Date().toISOString()
+        };
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            agentResponse.content += decoder.decode(value, { stream: true });
+            setIsWaitingForReply(false);
+            updateCaseData(caseData.id, { chat_history: [...caseData.chat_history, userMessage, { ...agentResponse }] });
+        }
+        agentResponse.content += decoder.decode();
+        updateCaseData(caseData.id, { chat_history: [...caseData.chat_history, userMessage, agentResponse] });
 
     } catch (err) {
         const errorResponse = {
@@ -213,6 +244,7 @@ const ChatPanel = ({ caseData, updateCaseData }) => {
         updateCaseData(caseData.id, { chat_history: [...caseData.chat_history, userMessage, errorResponse] });
     } finally {
         setIsTyping(false);
+        setIsWaitingForReply(false);
     }
   };
 
@@ -234,7 +266,7 @@ const ChatPanel = ({ caseData, updateCaseData }) => {
              {msg.sender === 'user' && <div className="w-8 h-8 rounded-full bg-gray-600 flex items-center justify-center text-white font-bold text-sm">U</div>}
           </div>
         ))}
-         {isTyping && (
+         {isWaitingForReply && (
           <div className="flex items-end gap-3">
             <div className="w-8 h-8 rounded-full bg-blue-500 flex items-center justify-center text-white font-bold text-sm">A</div>
             <div className="max-w-md p-3 rounded-2xl bg-gray-200 text-gray-800 rounded-bl-none">
@@ -271,6 +303,23 @@ const DocumentPanel = ({ caseData, updateCaseData }) => {
     const fileInputRef = useRef(null);
     const [isUploading, setIsUploading] = useState(false);
 
+    // Documents are parsed in the background; poll the case until none are pending
+    const hasPendingDocuments = caseData.documents.some(doc => doc.status === 'pending');
+    useEffect(() => {
+        if (!hasPendingDocuments) return;
+        const timer = setTimeout(async () => {
+            try {
+                const response = await fetch(`${API_BASE_URL}/api/cases/${caseData.id}`, { mode: 'cors' });
+                if (response.ok) {
+                    updateCaseData(caseData.id, await response.json());
+                }
+            } catch (err) {
+                console.error(err);
+            }
+        }, 2000);
+        return () => clearTimeout(timer);
+    }, [hasPendingDocuments, caseData, updateCaseData]);
+
     const handleFileChange = async (e) => {
         const file = e.target.files[0];
         if (!file) return;
@@ -291,10 +340,9 @@ const DocumentPanel = ({ caseData, updateCaseData }) => {
             // The agent adds a confirmation message, so we need to refetch the whole case
             // or get the updated chat history back. The backend currently handles this.
             // Let's refetch the case to get the latest chat history.
-            const caseResponse = await fetch(`${API_BASE_URL}/api/cases`, { mode: 'cors' });
-            const allCases = await caseResponse.json();
-            const updatedCase = allCases.find(c => c.id === caseData.id);
-            if (updatedCase) {
+            const caseResponse = await fetch(`${API_BASE_URL}/api/cases/${caseData.id}`, { mode: 'cors' });
+            if (caseResponse.ok) {
+                const updatedCase = await caseResponse.json();
                 updateCaseData(caseData.id, updatedCase);
             }
 